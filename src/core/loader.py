@@ -2,16 +2,18 @@
 from __future__ import annotations
 
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
+from uuid import uuid4
 import yaml
-from datetime import datetime
 
 
 # ---------- kleine Utilities ----------
 
 def now_stamp() -> str:
-    return datetime.now().strftime("%Y-%m-%d-%H-%M")
+    return time.strftime("%Y-%m-%d-%H-%M", time.localtime())
 
 
 def _mk_dir(p: Path) -> Path:
@@ -19,6 +21,36 @@ def _mk_dir(p: Path) -> Path:
     return p
 
 
+def _write_text_atomic(path: Path, text: str, encoding: str = "utf-8") -> None:
+    # Eindeutige Temp-Datei im Zielordner (keine Kollision paralleler Läufe),
+    # fsync, dann os.replace -> Leser sehen nie eine halb geschriebene Datei.
+    # Anlegen mit 0o666 -> der Kernel wendet die umask an wie bei einem normalen open();
+    # existiert das Ziel schon, werden dessen Rechte übernommen.
+    tmp = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            try:
+                mode = path.stat().st_mode & 0o7777
+            except FileNotFoundError:
+                mode = None
+            if mode is not None:
+                if hasattr(os, "fchmod"):
+                    os.fchmod(f.fileno(), mode)
+                else:
+                    os.chmod(tmp, mode)
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
 # ---------- Konfiguration laden ----------
 
 def load_config(cfg_path: Path) -> Dict:
@@ -69,27 +101,92 @@ def load_config(cfg_path: Path) -> Dict:
 
 # ---------- Logger ----------
 
+class _FastFormatter(logging.Formatter):
+    """Formatter, der den Zeitstempel nur einmal pro Sekunde per strftime erzeugt."""
+
+    _last_sec = -1
+    _last_str = ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_str = time.strftime(datefmt or self.default_time_format, self.converter(sec))
+            self._last_sec = sec
+        return self._last_str
+
+
+class _NoBulk(logging.Filter):
+    """Lässt Records mit extra={"bulk": True} (lange Listen) nur in die Logdatei."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not getattr(record, "bulk", False)
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler mit 64-KiB-Puffer statt flush() nach jedem Record.
+    Geschrieben wird, wenn der Puffer voll ist, sofort bei ERROR und höher,
+    per flush_phase_logger() an Phasengrenzen und beim close().
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=1 << 16,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+def _current_log_file(logger: logging.Logger) -> Optional[str]:
+    for h in logger.handlers:
+        if isinstance(h, logging.FileHandler):
+            return h.baseFilename
+    return None
+
+
 def setup_phase_logger(phase: str, logs_dir: Path, timestamp: str | None = None) -> Tuple[logging.Logger, Path]:
     """
     Erstellt einen Logger für eine Phase (AUSLESEN / REMUX / RENAME).
     Format wie in deinen Beispielen: "… | AUSLESEN | …"
+    Records mit extra={"bulk": True} landen nur in der Datei, nicht auf der Konsole.
+    Ist der Logger schon auf dieselbe Datei eingerichtet, wird er unverändert
+    zurückgegeben (kein erneutes Öffnen der Logdatei).
     """
     ts = timestamp or now_stamp()
     log_path = logs_dir / f"{ts}_{phase.lower()}.txt"
 
     logger = logging.getLogger(f"phase.{phase}")
-    logger.handlers.clear()
+    if _current_log_file(logger) == os.path.abspath(log_path):
+        return logger, log_path
+
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+        h.close()  # flusht den Dateipuffer
     logger.setLevel(logging.DEBUG)
 
-    fmt = logging.Formatter(f"%(asctime)s | %(levelname)-8s | {phase} | %(message)s", "%Y-%m-%d %H:%M:%S")
+    # Eine Formatter-Instanz für Datei + Konsole
+    fmt = _FastFormatter(f"%(asctime)s | %(levelname)-8s | {phase} | %(message)s", "%Y-%m-%d %H:%M:%S")
 
-    fh = logging.FileHandler(log_path, encoding="utf-8")
+    # Datei gepuffert (siehe _BufferedFileHandler); beim Prozessende
+    # schließt/flusht logging.shutdown alle Handler.
+    fh = _BufferedFileHandler(log_path, encoding="utf-8")
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(fmt)
 
+    # Konsole bleibt ungepuffert für direktes Feedback
     sh = logging.StreamHandler()
     sh.setLevel(logging.INFO)
     sh.setFormatter(fmt)
+    sh.addFilter(_NoBulk())
 
     logger.addHandler(fh)
     logger.addHandler(sh)
@@ -97,6 +194,15 @@ def setup_phase_logger(phase: str, logs_dir: Path, timestamp: str | None = None)
     return logger, log_path
 
 
+def flush_phase_logger(logger: logging.Logger) -> None:
+    """
+    Schreibt gepufferte Records sofort in die Logdatei.
+    Aufrufen an Phasengrenzen und bevor auf die Logdatei verwiesen wird.
+    """
+    for h in logger.handlers:
+        h.flush()
+
+
 def write_pipeline_index(logs_dir: Path, timestamp: str, phase_files: List[Tuple[str, Path]]) -> Path:
     """
     Schreibt eine kleine Übersichtsdatei, die auf die einzelnen Phasen-Logs verweist.
@@ -105,5 +211,5 @@ def write_pipeline_index(logs_dir: Path, timestamp: str, phase_files: List[Tuple
     lines = ["# Pipeline-Logs", ""]
     for phase, p in phase_files:
         lines.append(f"- {phase}: {p}")
-    index_path.write_text("\n".join(lines), encoding="utf-8")
+    _write_text_atomic(index_path, "\n".join(lines))
     return index_path
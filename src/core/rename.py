@@ -1,13 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import errno
 import json
 import logging
+import os
 import re
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from utils.naming import sanitize_filename
 
 # Diese Datei enthält NUR die Umbenenn-/Heuristik.
 # Sie wird von main.py momentan NICHT automatisch aufgerufen,
@@ -15,25 +22,81 @@ from typing import Dict, List, Optional, Tuple
 
 # ----------------- shared helpers -----------------
 
-def sanitize_filename(name: str) -> str:
-    name = name.strip()
-    name = re.sub(r"[\\/:\*\?\"<>\|\x00-\x1F]", "_", name)
-    name = re.sub(r"\s+", " ", name)
-    return name.strip().rstrip("._")
+_VERSION_RE = re.compile(r"\[(.+?)\]")
+_VERSION_STRIP_RE = re.compile(r"\s*\[.+?\]\s*")
+_YEAR_RE = re.compile(r"\((\d{4})\)")
+_YEAR_STRIP_RE = re.compile(r"\s*\(\d{4}\)\s*")
 
+@lru_cache(maxsize=1024)
 def parse_name_year(base: str) -> Tuple[str, Optional[str], Optional[str]]:
     name = base; version = None
-    mver = re.search(r"\[(.+?)\]", base)
+    mver = _VERSION_RE.search(base)
     if mver:
         version = mver.group(1).strip()
-        name = re.sub(r"\s*\[.+?\]\s*", " ", name).strip()
-    my = re.search(r"\((\d{4})\)", base)
+        name = _VERSION_STRIP_RE.sub(" ", name).strip()
+    my = _YEAR_RE.search(base)
     year = my.group(1) if my else None
     if my:
-        name = re.sub(r"\s*\(\d{4}\)\s*", " ", name).strip()
+        name = _YEAR_STRIP_RE.sub(" ", name).strip()
     name = sanitize_filename(name)
     return name, year, version
 
+def move_file(src: Path, dst: Path) -> None:
+    # Gleiches Dateisystem (Normalfall: tmp_out liegt unter remux_dir): ein rename-Syscall.
+    # Nur bei Laufwerks-/Mount-Grenzen auf shutil.move (Kopieren + Löschen) ausweichen.
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(src), str(dst))
+
+def _mkv_entries(d: Path) -> List[os.DirEntry]:
+    # Direkter Endungs-Vergleich statt glob/fnmatch. normcase wie glob: unter Windows
+    # egal (.MKV zählt), unter POSIX case-sensitiv (nur .mkv).
+    # Fehlendes tmp_out (z.B. MakeMKV vorher abgebrochen) = keine MKVs, wie bei glob.
+    try:
+        with os.scandir(d) as it:
+            return [e for e in it if os.path.normcase(e.name).endswith(".mkv") and e.is_file()]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+def _list_mkvs(d: Path) -> List[Tuple[Path, int]]:
+    # Ein scandir-Durchlauf liefert Pfad + Größe (DirEntry.stat, unter Windows ohne extra Syscall).
+    out: List[Tuple[Path, int]] = []
+    for e in _mkv_entries(d):
+        try:
+            size = e.stat().st_size
+        except FileNotFoundError:
+            size = -1
+        out.append((Path(e.path), size))
+    return out
+
+_cleanup_pool: Optional[ThreadPoolExecutor] = None
+
+def cleanup_tmp_out(tmp_out: Path) -> None:
+    # Normalfall: alles wurde verschoben, tmp_out ist leer -> ein rmdir.
+    # Sonst rmtree im Hintergrund, damit die nächste Disc nicht darauf wartet.
+    # Vorher auf einen eindeutigen Namen umbenennen: der nächste Lauf darf denselben
+    # tmp_out-Pfad wieder benutzen, ohne dass das laufende rmtree ihn erwischt.
+    # Offene Aufträge werden beim Interpreter-Ende von concurrent.futures abgewartet.
+    global _cleanup_pool
+    try:
+        tmp_out.rmdir()
+        return
+    except OSError:
+        pass
+    doomed = tmp_out.with_name(f"{tmp_out.name}.del-{uuid4().hex}")
+    try:
+        tmp_out.rename(doomed)
+    except OSError:
+        # Umbenennen nicht möglich (z.B. Datei gesperrt) -> synchron aufräumen
+        shutil.rmtree(tmp_out, ignore_errors=True)
+        return
+    if _cleanup_pool is None:
+        _cleanup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tmp-cleanup")
+    _cleanup_pool.submit(shutil.rmtree, doomed, ignore_errors=True)
+
 # ----------------- probing (ffprobe/mediainfo) -----------------
 
 def _probe_ffprobe(path: Path, ffprobe_path: str, log: logging.Logger) -> Optional[float]:
@@ -81,15 +144,19 @@ def probe_duration_seconds(p: Path, prefer_ffprobe: bool, ffprobe_path: str, med
 
 # ----------------- classification helpers -----------------
 
+_TITLE_IDX_RES = (
+    re.compile(r"[^\d](\d{1,3})\.mkv$"),
+    re.compile(r"_t(\d{1,3})\.mkv$", re.IGNORECASE),
+    re.compile(r"(\d{1,3})\.mkv$"),
+)
+
 def extract_title_index(fname: str) -> int:
-    m = re.search(r"[^\d](\d{1,3})\.mkv$", fname)
-    if m:
-        return int(m.group(1))
-    m = re.search(r"_t(\d{1,3})\.mkv$", fname, re.IGNORECASE)
-    if m:
-        return int(m.group(1))
-    m = re.search(r"(\d{1,3})\.mkv$", fname)
-    return int(m.group(1)) if m else 9999
+    # Sortierschlüssel für MakeMKV-Titel (…_t03.mkv); Muster in Prioritätsreihenfolge
+    for rx in _TITLE_IDX_RES:
+        m = rx.search(fname)
+        if m:
+            return int(m.group(1))
+    return 9999
 
 def median(values: List[float]) -> float:
     s = sorted(values); n = len(s)
@@ -127,7 +194,7 @@ def rename_and_move_movie(
     probe_cfg: dict,
     log: logging.Logger
 ) -> bool:
-    files = sorted(tmp_out.glob("*.mkv"))
+    files = [Path(e.path) for e in _mkv_entries(tmp_out)]
     if not files:
         log.error(f"Keine MKVs in {tmp_out}.")
         return False
@@ -155,13 +222,13 @@ def rename_and_move_movie(
     TR = int(behavior.get("trailer_max_seconds", 240))
     dry_run = bool(behavior.get("dry_run", True))
 
+    # Alle Ziele liegen direkt in dest_base (oben bereits angelegt) -> kein mkdir pro Datei
     def mv(src: Path, dst: Path):
-        dst.parent.mkdir(parents=True, exist_ok=True)
         if dry_run:
-            log.info(f"[DRY-RUN] Move: {src} -> {dst}")
+            log.info("[DRY-RUN] Move: %s -> %s", src, dst)
         else:
-            shutil.move(str(src), str(dst))
-            log.info(f"Verschoben: {src.name} -> {dst}")
+            move_file(src, dst)
+            log.info("Verschoben: %s -> %s", src.name, dst)
 
     main_done = False
     trailer_counter = 1
@@ -190,13 +257,15 @@ def rename_and_move_movie(
 
     try:
         if not dry_run:
-            shutil.rmtree(tmp_out, ignore_errors=True)
+            cleanup_tmp_out(tmp_out)
     except Exception:
         pass
     return ok
 
 # ----------------- tv rename -----------------
 
+_GIB = float(1 << 30)
+
 def rename_and_move_tv(
     tmp_out: Path,
     dest_base: Path,
@@ -209,7 +278,8 @@ def rename_and_move_tv(
     probe_cfg: dict,
     log: logging.Logger,
 ) -> Tuple[bool, int]:
-    files = sorted(tmp_out.glob("*.mkv"), key=lambda p: (extract_title_index(p.name), p.name))
+    sizes: Dict[Path, int] = dict(_list_mkvs(tmp_out))
+    files = sorted(sizes, key=lambda p: (extract_title_index(p.name), p.name))
     if not files:
         log.error(f"Keine MKVs in {tmp_out}.")
         return False, start_episode_no
@@ -222,14 +292,9 @@ def rename_and_move_tv(
     mediainfo_path = probe_cfg.get("mediainfo_path", "mediainfo")
 
     durations: Dict[Path, float] = {}
-    sizes: Dict[Path, int] = {}
     for f in files:
         d = probe_duration_seconds(f, prefer_ffprobe, ffprobe_path, mediainfo_path, log)
         durations[f] = d if d is not None else -1.0
-        try:
-            sizes[f] = f.stat().st_size
-        except FileNotFoundError:
-            sizes[f] = -1
 
     TR    = int(behavior.get("trailer_max_seconds", 240))
     EP_MIN = int(behavior.get("episode_min_seconds", 18*60))
@@ -263,18 +328,18 @@ def rename_and_move_tv(
 
     log.info(
         f"Episoden-Median: {ep_med:.1f}s | Fenster: [{lo:.1f}, {hi:.1f}] | "
-        f"Größen-Median: {size_med/1024/1024/1024:.2f} GiB | Fenster: [{slo/1024/1024/1024:.2f}, {shi/1024/1024/1024:.2f}] GiB | "
+        f"Größen-Median: {size_med/_GIB:.2f} GiB | Fenster: [{slo/_GIB:.2f}, {shi/_GIB:.2f}] GiB | "
         f"Start-Episode: {start_episode_no:02d} | Erwartet gesamt: {expected_total_eps} | "
         f"Verbleibend: {remaining_total} | Letzte Disc: {is_last_disc}"
     )
 
+    # Alle Ziele liegen direkt in dest_base (oben bereits angelegt) -> kein mkdir pro Datei
     def mv(src: Path, dst: Path):
-        dst.parent.mkdir(parents=True, exist_ok=True)
         if dry_run:
-            log.info(f"[DRY-RUN] Move: {src} -> {dst}")
+            log.info("[DRY-RUN] Move: %s -> %s", src, dst)
         else:
-            shutil.move(str(src), str(dst))
-            log.info(f"Verschoben: {src.name} -> {dst}")
+            move_file(src, dst)
+            log.info("Verschoben: %s -> %s", src.name, dst)
 
     ep_no = start_episode_no
     trailer_counter = 1
@@ -283,31 +348,43 @@ def rename_and_move_tv(
 
     use_size_fallback = (ep_med <= 0) or (len(candidates) < max(1, len(files)//3))
 
+    # Konstanter Teil der Episoden-Zielnamen (Serie + Season) einmal vorab
+    ep_prefix = f"{name} – S{season_no:02d}E" if season_no is not None else f"{name} – E"
+
+    # Schwellwerte hängen nur von Medianen/Config ab -> einmal pro Disc statt pro Datei
+    tiny_trailer_max = EP_MIN * 0.6
+    dbl_lo, dbl_hi = (2.0 - dtol) * ep_med, (2.0 + dtol) * ep_med
+    sdbl_lo, sdbl_hi = (2.0 - dtol) * size_med, (2.0 + dtol) * size_med
+    playall_size_min = factor_min * size_med
+    has_size_med = size_med > 0
+    double_beats_playall = is_last_disc and remaining_total is not None and remaining_total <= 4
+    mode = "SIZE" if use_size_fallback else "DURATION"
+
     for f in files:
         dur = durations.get(f, -1.0)
         size = sizes.get(f, -1)
         tiny = size >= 0 and size < TINY
 
         # Trailer
-        is_trailer = (dur >= 0 and dur <= TR) or (tiny and dur > 0 and dur <= EP_MIN*0.6)
+        is_trailer = (dur >= 0 and dur <= TR) or (tiny and dur > 0 and dur <= tiny_trailer_max)
 
         if use_size_fallback:
-            is_episode = (not tiny) and (size_med > 0) and (size >= slo and size <= shi)
-            is_double_ep = (not tiny) and (size_med > 0) and (size >= (2.0 - dtol) * size_med and size <= (2.0 + dtol) * size_med)
-            playall_candidate = (not tiny) and (size_med > 0) and (size >= factor_min * size_med)
+            sized = has_size_med and not tiny
+            is_episode = sized and (size >= slo and size <= shi)
+            is_double_ep = sized and (size >= sdbl_lo and size <= sdbl_hi)
+            playall_candidate = sized and (size >= playall_size_min)
         else:
             is_episode = (dur >= lo and dur <= hi) and not tiny
-            is_double_ep = not tiny and dur > hi and dur >= (2.0 - dtol) * ep_med and dur <= (2.0 + dtol) * ep_med
+            is_double_ep = not tiny and dur > hi and dur >= dbl_lo and dur <= dbl_hi
             playall_candidate = dur > 0 and is_playall(dur, ep_med, remaining_total, factor_min, factor_soft, tol_min, tol_max)
 
-        if is_last_disc and remaining_total is not None and remaining_total <= 4:
-            if is_double_ep:
-                playall_candidate = False
+        if double_beats_playall and is_double_ep:
+            playall_candidate = False
 
         log.debug(
-            f"Classify: {f.name} | dur={dur:.1f}s | size={size} | tiny={tiny} | "
-            f"episode={is_episode} | double={is_double_ep} | trailer={is_trailer} | playall?={playall_candidate} | "
-            f"mode={'SIZE' if use_size_fallback else 'DURATION'}"
+            "Classify: %s | dur=%.1fs | size=%s | tiny=%s | episode=%s | double=%s | "
+            "trailer=%s | playall?=%s | mode=%s",
+            f.name, dur, size, tiny, is_episode, is_double_ep, is_trailer, playall_candidate, mode
         )
 
         if playall_candidate and not is_episode and not is_double_ep:
@@ -316,20 +393,14 @@ def rename_and_move_tv(
             continue
 
         if is_double_ep:
-            if season_no is not None:
-                tgt = dest_base / f"{name} – S{season_no:02d}E{ep_no:02d}-E{ep_no+1:02d}.mkv"
-            else:
-                tgt = dest_base / f"{name} – E{ep_no:02d}-E{ep_no+1:02d}.mkv"
+            tgt = dest_base / f"{ep_prefix}{ep_no:02d}-E{ep_no+1:02d}.mkv"
             ep_no += 2
             mv(f, tgt)
             success_any = True
             continue
 
         if is_episode:
-            if season_no is not None:
-                tgt = dest_base / f"{name} – S{season_no:02d}E{ep_no:02d}.mkv"
-            else:
-                tgt = dest_base / f"{name} – E{ep_no:02d}.mkv"
+            tgt = dest_base / f"{ep_prefix}{ep_no:02d}.mkv"
             ep_no += 1
             mv(f, tgt)
             success_any = True
@@ -352,7 +423,7 @@ def rename_and_move_tv(
 
     try:
         if not dry_run:
-            shutil.rmtree(tmp_out, ignore_errors=True)
+            cleanup_tmp_out(tmp_out)
     except Exception:
         pass
 
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
 from pathlib import Path
 import sys
 
 from core.loader import (
     load_config,
     setup_phase_logger,
+    flush_phase_logger,
     write_pipeline_index,
     now_stamp,
 )
@@ -25,48 +27,50 @@ def main():
     auslesen_log, auslesen_log_path = setup_phase_logger("AUSLESEN", cfg["paths"]["logs_dir"], ts)
 
     auslesen_log.info("=== START: Testlauf Logger + Scanner ===")
-    auslesen_log.info(f"Base Root     : {cfg['paths']['base_root']}")
-    auslesen_log.info(f"Transcode Dir : {cfg['paths']['transcode_dir']}")
-    auslesen_log.info(f"Remux Dir     : {cfg['paths']['remux_dir']}")
-    auslesen_log.info(f"Logs Dir      : {cfg['paths']['logs_dir']}")
-    auslesen_log.info(f"Dry-Run       : {cfg['app']['dry_run']}")
-    auslesen_log.info(f"TMDb enabled  : {cfg['tmdb']['enabled']}")
+    auslesen_log.info("Base Root     : %s", cfg["paths"]["base_root"])
+    auslesen_log.info("Transcode Dir : %s", cfg["paths"]["transcode_dir"])
+    auslesen_log.info("Remux Dir     : %s", cfg["paths"]["remux_dir"])
+    auslesen_log.info("Logs Dir      : %s", cfg["paths"]["logs_dir"])
+    auslesen_log.info("Dry-Run       : %s", cfg["app"]["dry_run"])
+    auslesen_log.info("TMDb enabled  : %s", cfg["tmdb"]["enabled"])
 
     transcode_root = cfg["paths"]["transcode_dir"]
     if not transcode_root.exists():
-        auslesen_log.error(f"Transcode-Verzeichnis existiert nicht: {transcode_root}")
+        auslesen_log.error("Transcode-Verzeichnis existiert nicht: %s", transcode_root)
         auslesen_log.info("=== ENDE: Keine Quellen ===")
+        flush_phase_logger(auslesen_log)
         # Pipeline-Index trotzdem schreiben
         pipeline = write_pipeline_index(cfg["paths"]["logs_dir"], ts, [("AUSLESEN", auslesen_log_path)])
-        auslesen_log.info(f"(Gesamte Pipeline-Logs in: {pipeline})")
+        auslesen_log.info("(Gesamte Pipeline-Logs in: %s)", pipeline)
         sys.exit(3)
 
     # Scannen
     sources = find_sources(transcode_root, auslesen_log)
-    auslesen_log.info(f"Gefundene Quellen: {len(sources)}")
+    auslesen_log.info("Gefundene Quellen: %d", len(sources))
 
-    # Ausgabe der ersten Liste in menschenlesbarer Form (wie zuvor)
-    for i, s in enumerate(sources, 1):
-        cat = s.get("category") or "-"
-        kind = s.get("kind")
-        disc_type = s.get("disc_type") or "-"
-        path = s.get("path")
-        disp = s.get("display")
-        season = s.get("season")
-        disc = s.get("disc")
-        note = s.get("note")
-        msg = (
-            f"[{i:03d}] cat={cat} | kind={kind} | disc_type={disc_type} | "
-            f"season={season} | disc={disc} | display='{disp}' | path={path}"
-        )
-        if note:
-            msg += f" | note={note}"
-        auslesen_log.info(msg)
+    # Ausgabe der ersten Liste in menschenlesbarer Form (wie zuvor),
+    # gesammelt als ein Log-Record statt einem pro Quelle.
+    # Zeilen nur bauen, wenn INFO überhaupt ausgegeben wird.
+    if sources and auslesen_log.isEnabledFor(logging.INFO):
+        lines = []
+        for i, s in enumerate(sources, 1):
+            msg = (
+                f"[{i:03d}] cat={s.category or '-'} | kind={s.kind} | disc_type={s.disc_type or '-'} | "
+                f"season={s.season} | disc={s.disc} | display='{s.display}' | path={s.path}"
+            )
+            if s.note:
+                msg += f" | note={s.note}"
+            lines.append(msg)
+        # Volle Liste nur ins Logfile; Konsole bekommt einen Hinweis
+        auslesen_log.info("Quellen (%d):\n%s", len(lines), "\n".join(lines), extra={"bulk": True})
+        flush_phase_logger(auslesen_log)  # Liste muss in der Datei stehen, bevor die Konsole darauf verweist
+        auslesen_log.info("Quellen-Liste (%d) ins Logfile geschrieben: %s", len(lines), auslesen_log_path)
 
     auslesen_log.info("=== ENDE: Testlauf Logger + Scanner ===")
+    flush_phase_logger(auslesen_log)
 
     pipeline = write_pipeline_index(cfg["paths"]["logs_dir"], ts, [("AUSLESEN", auslesen_log_path)])
-    auslesen_log.info(f"(Gesamte Pipeline-Logs in: {pipeline})")
+    auslesen_log.info("(Gesamte Pipeline-Logs in: %s)", pipeline)
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ Stabiler Loader-Einstieg für den Scanner.
 BITTE NICHT anfassen, wenn die Erkennung läuft.
 
 Exportierte (kompatible) Entry-Points:
-- find_sources(transcode_root: Path, log) -> list[dict]
+- find_sources(transcode_root: Path, log) -> list[Source]
 - scan_sources(...)
 - scan_transcode(...)
 - scan(...)
@@ -15,26 +15,26 @@ Alle rufen denselben, stabilen Scanner auf.
 
 from __future__ import annotations
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Optional
 
 # WICHTIG: Der Scanner ist in einer separaten Datei, die wir hier nur durchreichen.
-from .scanner import find_sources as _stable_find_sources  # stabile, getestete Implementierung
+from .scanner import Source, find_sources as _stable_find_sources  # stabile, getestete Implementierung
 
 
-def find_sources(transcode_root: Path, log) -> List[Dict]:
+def find_sources(transcode_root: Path, log) -> List[Source]:
     """Bevorzugter Entry-Point."""
     return _stable_find_sources(transcode_root, log)
 
 
 # Kompatible Alias-Namen – NICHT ändern, damit main/ältere Versionen funktionieren:
-def scan_sources(transcode_root: Path, log) -> List[Dict]:
+def scan_sources(transcode_root: Path, log) -> List[Source]:
     return _stable_find_sources(transcode_root, log)
 
-def scan_transcode(transcode_root: Path, log) -> List[Dict]:
+def scan_transcode(transcode_root: Path, log) -> List[Source]:
     return _stable_find_sources(transcode_root, log)
 
-def scan(transcode_root: Path, log) -> List[Dict]:
+def scan(transcode_root: Path, log) -> List[Source]:
     return _stable_find_sources(transcode_root, log)
 
-def build_sources(transcode_root: Path, log) -> List[Dict]:
+def build_sources(transcode_root: Path, log) -> List[Source]:
     return _stable_find_sources(transcode_root, log)
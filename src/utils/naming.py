@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from functools import lru_cache
+
+# Gemeinsame Namens-Helfer für Scanner und Rename (eine Implementierung statt Kopien).
+
+# Ungültige Zeichen (Windows-reserviert + Steuerzeichen 0x00–0x1F) -> "_".
+# str.translate ist ein reiner Zeichen-Mapping-Durchlauf in C, ohne Regex-Engine.
+_FS_TABLE = {ord(c): "_" for c in '\\/:*?"<>|'}
+_FS_TABLE.update({i: "_" for i in range(0x20)})
+
+
+@lru_cache(maxsize=1024)
+def sanitize_filename(name: str) -> str:
+    name = name.strip().translate(_FS_TABLE)
+    # Whitespace-Folgen zu einem Leerzeichen; split() trimmt dabei auch die Ränder
+    name = " ".join(name.split())
+    return name.rstrip("._")